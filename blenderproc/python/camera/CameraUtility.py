@@ -14,28 +14,68 @@ from blenderproc.python.utility.Utility import KeyFrame
 def add_camera_pose(cam2world_matrix: Union[np.ndarray, Matrix], frame: Optional[int] = None) -> int:
     """ Sets a new camera pose to a new or existing frame
 
+    The pose is set via add_camera_poses(), so the matrix_world of the camera object might only be updated with
+    the next evaluation of the depsgraph. Use get_camera_pose() to read back the pose of a frame.
+
     :param cam2world_matrix: The transformation matrix from camera to world coordinate system
     :param frame: Optional, the frame to set the camera pose to.
     :return: The frame to which the pose has been set.
     """
-    if not isinstance(cam2world_matrix, Matrix):
-        cam2world_matrix = Matrix(cam2world_matrix)
+    return add_camera_poses([cam2world_matrix], frame)[0]
+
+
+def add_camera_poses(cam2world_matrices: Union[np.ndarray, List[Union[np.ndarray, Matrix]]],
+                     start_frame: Optional[int] = None) -> List[int]:
+    """ Sets multiple camera poses to consecutive new or existing frames
+
+    Compared to calling add_camera_pose() for every pose, the frame range is only extended once.
+    Each matrix is decomposed once and the resulting location and rotation are set and keyframed directly,
+    instead of going through the matrix_world setter of the camera object. This is only possible for unparented
+    cameras using an euler rotation mode, otherwise the matrix_world setter is used.
 
-    # Set cam2world_matrix
+    Note: If the location and rotation are set directly, the matrix_world of the camera object is only updated
+    with the next evaluation of the depsgraph. Use get_camera_pose() to read back the pose of a frame.
+
+    :param cam2world_matrices: The transformation matrices from camera to world coordinate system, either as
+                               array of shape (N, 4, 4) or as list of 4x4 matrices.
+    :param start_frame: Optional, the frame to set the first camera pose to. The following poses are set to the
+                        following frames. If None is given, the poses are appended after the last frame.
+    :return: The frames to which the poses have been set.
+    """
     cam_ob = bpy.context.scene.camera
-    cam_ob.matrix_world = cam2world_matrix
 
-    # Add new frame if no frame is given
-    if frame is None:
-        frame = bpy.context.scene.frame_end
-    if bpy.context.scene.frame_end < frame + 1:
-        bpy.context.scene.frame_end = frame + 1
+    # Add new frames if no start frame is given
+    if start_frame is None:
+        start_frame = bpy.context.scene.frame_end
+    frames = list(range(start_frame, start_frame + len(cam2world_matrices)))
+    if frames and bpy.context.scene.frame_end < frames[-1] + 1:
+        bpy.context.scene.frame_end = frames[-1] + 1
+
+    # For parented cameras the world pose differs from the local one and only euler modes use rotation_euler
+    set_directly = cam_ob.parent is None and cam_ob.rotation_mode in ('XYZ', 'XZY', 'YXZ', 'YZX', 'ZXY', 'ZYX')
+    if cam_ob.rotation_mode == 'QUATERNION':
+        rotation_data_path = 'rotation_quaternion'
+    elif cam_ob.rotation_mode == 'AXIS_ANGLE':
+        rotation_data_path = 'rotation_axis_angle'
+    else:
+        rotation_data_path = 'rotation_euler'
+    for frame, cam2world_matrix in zip(frames, cam2world_matrices):
+        if not isinstance(cam2world_matrix, Matrix):
+            cam2world_matrix = Matrix(cam2world_matrix)
+        if set_directly:
+            location, rotation, scale = cam2world_matrix.decompose()
+            cam_ob.location = location
+            # Use an euler rotation compatible to the previous one, to avoid flips between the keyframes
+            cam_ob.rotation_euler = rotation.to_euler(cam_ob.rotation_mode, cam_ob.rotation_euler)
+            cam_ob.scale = scale
+        else:
+            cam_ob.matrix_world = cam2world_matrix
 
-    # Persist camera pose
-    cam_ob.keyframe_insert(data_path='location', frame=frame)
-    cam_ob.keyframe_insert(data_path='rotation_euler', frame=frame)
+        # Persist camera pose
+        cam_ob.keyframe_insert(data_path='location', frame=frame)
+        cam_ob.keyframe_insert(data_path=rotation_data_path, frame=frame)
 
-    return frame
+    return frames
 
 
 def get_camera_pose(frame: Optional[int] = None) -> np.ndarray:
@@ -135,6 +175,49 @@ def rotation_from_forward_vec(forward_vec: Union[np.ndarray, Vector], up_axis: s
     return np.array(rotation_matrix)
 
 
+def rotation_from_forward_vecs(forward_vecs: np.ndarray,
+                               inplane_rot: Optional[Union[float, np.ndarray]] = None) -> np.ndarray:
+    """ Returns the camera rotation matrices for multiple forward vectors at once, using Y as up axis.
+
+    This is the vectorized version of rotation_from_forward_vec(), which computes the rotations directly in numpy
+    instead of going through mathutils for every vector. The camera looks along -Z with its Y axis pointing as
+    close as possible towards the world Z axis.
+
+    :param forward_vecs: The forward vectors of shape (N, 3), which specify the directions the camera should look.
+    :param inplane_rot: The inplane rotation in radians, either one for all vectors or one per vector of shape (N,).
+                        If None is given, the inplane rotation is determined only based on the up vector.
+    :return: The corresponding rotation matrices of shape (N, 3, 3).
+    """
+    forward_vecs = np.asarray(forward_vecs, dtype=np.float64).reshape(-1, 3)
+    rotation_matrices = np.empty((len(forward_vecs), 3, 3))
+
+    # The camera z axis points in the opposite direction of the forward vector
+    z_axis = -forward_vecs / np.linalg.norm(forward_vecs, axis=1, keepdims=True)
+    # The camera y axis is the world up axis projected onto the image plane
+    y_axis = np.array([0.0, 0.0, 1.0]) - z_axis[:, 2:3] * z_axis
+    y_axis_norm = np.linalg.norm(y_axis, axis=1, keepdims=True)
+    # If the camera looks straight up or down, the up axis is not defined, these are handled by mathutils
+    degenerated = y_axis_norm[:, 0] < 1e-4
+    y_axis[~degenerated] /= y_axis_norm[~degenerated]
+    rotation_matrices[:, :, 0] = np.cross(y_axis, z_axis)
+    rotation_matrices[:, :, 1] = y_axis
+    rotation_matrices[:, :, 2] = z_axis
+    for i in np.flatnonzero(degenerated):
+        rotation_matrices[i] = rotation_from_forward_vec(forward_vecs[i])
+
+    if inplane_rot is not None:
+        inplane_rot = np.broadcast_to(inplane_rot, (len(forward_vecs),))
+        cos, sin = np.cos(inplane_rot), np.sin(inplane_rot)
+        inplane_rotation_matrices = np.zeros((len(forward_vecs), 3, 3))
+        inplane_rotation_matrices[:, 0, 0] = cos
+        inplane_rotation_matrices[:, 0, 1] = -sin
+        inplane_rotation_matrices[:, 1, 0] = sin
+        inplane_rotation_matrices[:, 1, 1] = cos
+        inplane_rotation_matrices[:, 2, 2] = 1
+        rotation_matrices = rotation_matrices @ inplane_rotation_matrices
+    return rotation_matrices
+
+
 def set_resolution(image_width: int = None, image_height: int = None):
     """ Sets the camera resolution.
 
@@ -241,16 +324,16 @@ def set_intrinsics_from_K_matrix(K: Union[np.ndarray, Matrix], image_width: int,
     :param clip_end: Clipping end.
     """
 
-    K = Matrix(K)
+    K = np.asarray(K, dtype=np.float64)
 
     cam = bpy.context.scene.camera.data
 
-    if abs(K[0][1]) > 1e-7:
+    if abs(K[0, 1]) > 1e-7:
         raise ValueError(f"Skew is not supported by blender and therefore "
-                         f"not by BlenderProc, set this to zero: {K[0][1]} and recalibrate")
+                         f"not by BlenderProc, set this to zero: {K[0, 1]} and recalibrate")
 
-    fx, fy = K[0][0], K[1][1]
-    cx, cy = K[0][2], K[1][2]
+    fx, fy = K[0, 0], K[1, 1]
+    cx, cy = K[0, 2], K[1, 2]
 
     # If fx!=fy change pixel aspect ratio
     pixel_aspect_x = pixel_aspect_y = 1
@@ -352,26 +435,7 @@ def get_intrinsics_as_K_matrix() -> np.ndarray:
 
     :return: The 3x3 K matrix
     """
-    cam_ob = bpy.context.scene.camera
-    cam = cam_ob.data
-
-    f_in_mm = cam.lens
-    resolution_x_in_px = bpy.context.scene.render.resolution_x
-    resolution_y_in_px = bpy.context.scene.render.resolution_y
-
-    # Compute sensor size in mm and view in px
-    pixel_aspect_ratio = bpy.context.scene.render.pixel_aspect_y / bpy.context.scene.render.pixel_aspect_x
-    view_fac_in_px = get_view_fac_in_px(cam, bpy.context.scene.render.pixel_aspect_x,
-                                        bpy.context.scene.render.pixel_aspect_y, resolution_x_in_px, resolution_y_in_px)
-    sensor_size_in_mm = get_sensor_size(cam)
-
-    # Convert focal length in mm to focal length in px
-    fx = f_in_mm / sensor_size_in_mm * view_fac_in_px
-    fy = fx / pixel_aspect_ratio
-
-    # Convert principal point in blenders format to px
-    cx = (resolution_x_in_px - 1) / 2 - cam.shift_x * view_fac_in_px
-    cy = (resolution_y_in_px - 1) / 2 + cam.shift_y * view_fac_in_px / pixel_aspect_ratio
+    fx, fy, cx, cy = _get_intrinsics_in_px(bpy.context.scene.camera.data)
 
     # Build K matrix
     K = np.array([[fx, 0, cx],
@@ -388,14 +452,40 @@ def get_fov() -> Tuple[float, float]:
 
     :return: The horizontal and vertical FOV in radians.
     """
-    # Get focal length
-    K = get_intrinsics_as_K_matrix()
+    fx, fy, _, _ = _get_intrinsics_in_px(bpy.context.scene.camera.data)
+
     # Convert focal length to FOV
-    fov_x = 2 * np.arctan(bpy.context.scene.render.resolution_x / 2 / K[0, 0])
-    fov_y = 2 * np.arctan(bpy.context.scene.render.resolution_y / 2 / K[1, 1])
+    fov_x = 2 * np.arctan(bpy.context.scene.render.resolution_x / 2 / fx)
+    fov_y = 2 * np.arctan(bpy.context.scene.render.resolution_y / 2 / fy)
     return fov_x, fov_y
 
 
+def _get_intrinsics_in_px(cam: bpy.types.Camera) -> Tuple[float, float, float, float]:
+    """ Returns the focal lengths and the principal point of the given camera in pixels.
+
+    :param cam: The camera object.
+    :return: fx, fy, cx and cy
+    """
+    f_in_mm = cam.lens
+    resolution_x_in_px = bpy.context.scene.render.resolution_x
+    resolution_y_in_px = bpy.context.scene.render.resolution_y
+
+    # Compute sensor size in mm and view in px
+    pixel_aspect_ratio = bpy.context.scene.render.pixel_aspect_y / bpy.context.scene.render.pixel_aspect_x
+    view_fac_in_px = get_view_fac_in_px(cam, bpy.context.scene.render.pixel_aspect_x,
+                                        bpy.context.scene.render.pixel_aspect_y, resolution_x_in_px, resolution_y_in_px)
+    sensor_size_in_mm = get_sensor_size(cam)
+
+    # Convert focal length in mm to focal length in px
+    fx = f_in_mm / sensor_size_in_mm * view_fac_in_px
+    fy = fx / pixel_aspect_ratio
+
+    # Convert principal point in blenders format to px
+    cx = (resolution_x_in_px - 1) / 2 - cam.shift_x * view_fac_in_px
+    cy = (resolution_y_in_px - 1) / 2 + cam.shift_y * view_fac_in_px / pixel_aspect_ratio
+    return fx, fy, cx, cy
+
+
 def add_depth_of_field(focal_point_obj: Entity, fstop_value: float,
                        aperture_blades: int = 0, aperture_rotation: float = 0.0, aperture_ratio: float = 1.0,
                        focal_distance: float = -1.0):
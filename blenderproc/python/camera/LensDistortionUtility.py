@@ -9,7 +9,8 @@ Note that, unlike in that wikipedia entry as of early 2021, we're here using the
 """
 
 import os
-from typing import Union, List, Tuple, Optional
+import math
+from typing import Union, List, Tuple, Optional, Dict
 
 import numpy as np
 import yaml
@@ -20,6 +21,10 @@ from blenderproc.python.utility.GlobalStorage import GlobalStorage
 from blenderproc.python.camera import CameraUtility
 from blenderproc.python.utility.MathUtility import change_source_coordinate_frame_of_transformation_matrix
 
+# Caches the undistorted pixel projections of the last used resolution and K matrix, as they are the same
+# for repeated set_lens_distortion calls with the same camera
+_undistorted_projection_cache: Dict[Tuple[int, int, float, float, float, float], Tuple[np.ndarray, np.ndarray]] = {}
+
 
 def set_lens_distortion(k1: float, k2: float, k3: float = 0.0, p1: float = 0.0, p2: float = 0.0,
                         use_global_storage: bool = False) -> np.ndarray:
@@ -77,13 +82,7 @@ def set_lens_distortion(k1: float, k2: float, k3: float = 0.0, p1: float = 0.0,
     fx, fy = camera_K_matrix[0][0], camera_K_matrix[1][1]
     cx, cy = camera_K_matrix[0][2], camera_K_matrix[1][2]
 
-    # Get row,column image coordinates for all pixels for row-wise image flattening
-    # The center of the upper-left pixel has coordinates [0,0] both in DLR CalDe and python/scipy
-    row = np.repeat(np.arange(0, original_image_resolution[0]), original_image_resolution[1])
-    column = np.tile(np.arange(0, original_image_resolution[1]), original_image_resolution[0])
-
-    # P_und is the undistorted pinhole projection at z==1 of all image pixels
-    P_und = np.linalg.inv(camera_K_matrix) @ np.vstack((column, row, np.ones(np.prod(original_image_resolution[:2]))))
+    px, py = _get_undistorted_projections(original_image_resolution, fx, fy, cx, cy)
 
     # P_und are then distorted by the lens, i.e. P_dis = dis(P_und)
     # => Find mapping I_dis(row,column) -> I_und(float,float)
@@ -93,7 +92,7 @@ def set_lens_distortion(k1: float, k2: float, k3: float = 0.0, p1: float = 0.0,
     # are located at real coordinates to be calculated. After that we can
     # interpolate on the original undistorted image.
     # Since dis() cannot be inverted, we iterate (up to ~10 times
-    # depending on the AOV and the distortion):
+    # depending on the AOV and the distortion, less with newton steps):
     # 1) assume P_und~=P_dis
     # 2) distort()
     # 3) estimate distance between dist(P_und) and P_dis
@@ -108,29 +107,65 @@ def set_lens_distortion(k1: float, k2: float, k3: float = 0.0, p1: float = 0.0,
     # when generating the mapping matrix but much slower in inference.
 
     # Init dist at undist
-    x = P_und[0, :].copy()
-    y = P_und[1, :].copy()
-    res = [1e3]
+    x = px.copy()
+    y = py.copy()
+    k1_32, k2_32, k3_32, p1_32, p2_32 = np.float32(k1), np.float32(k2), np.float32(k3), np.float32(p1), np.float32(p2)
+    fx_32, fy_32 = np.float32(fx), np.float32(fy)
+    # preallocate all buffers used inside the loop, to avoid allocating full-size temporaries in every iteration
+    scratch = np.empty((5, x.size), dtype=x.dtype)
+    # the projections before the last newton step, to undo it if the residual grows
+    prev_x, prev_y = np.empty_like(x), np.empty_like(y)
+    # the residual of the worst pixel is tracked squared, which avoids taking a sqrt for every pixel
+    squared_res = [1e6]
     it = 0
-    while res[-1] > 0.15:
-        r2 = np.square(x) + np.square(y)
-        radial_part = 1 + k1 * r2 + k2 * r2 * r2 + k3 * r2 * r2 * r2
-        x_ = x * radial_part + 2 * p2 * x * y + p1 * (r2 + 2 * np.square(x))
-        y_ = y * radial_part + 2 * p1 * x * y + p2 * (r2 + 2 * np.square(y))
-
-        error = np.max(np.hypot(fx * (x_ - P_und[0, :]), fy * (y_ - P_und[1, :])))
-        res.append(error)
+    use_newton_step = True
+    while squared_res[-1] > 0.15 ** 2:
+        x_, y_ = _distort_normalized_coords(x, y, k1_32, k2_32, k3_32, p1_32, p2_32, scratch)
+        _, _, r2, _, jacobian = scratch
+        if use_newton_step:
+            # approximate the jacobian of the distortion by the derivative of the radial distortion along the
+            # radius 1 + 3 * k1 * r2 + 5 * k2 * r2^2 + 7 * k3 * r2^3, the decentering terms are negligible here
+            np.multiply(r2, 7 * k3_32, out=jacobian)
+            jacobian += 5 * k2_32
+            jacobian *= r2
+            jacobian += 3 * k1_32
+            jacobian *= r2
+            jacobian += 1
+            # the approximation gets small or even negative at large radii for strong barrel distortions,
+            # dividing by it would send these pixels far off, so take the plain fixed-point step there
+            jacobian[jacobian < 0.5] = 1
+
+        # turn the distorted projections into residuals in place, the intermediate scratch rows are free again
+        x_ -= px
+        y_ -= py
+        _, _, err_x, err_y, _ = scratch
+        np.multiply(x_, fx_32, out=err_x)
+        err_x *= err_x
+        np.multiply(y_, fy_32, out=err_y)
+        err_y *= err_y
+        err_x += err_y
+        squared_error = float(np.max(err_x))
         it += 1
 
+        if use_newton_step and it > 1 and squared_error > squared_res[-1]:
+            # Undo the last newton step and continue from there with the more robust fixed-point iteration
+            np.copyto(x, prev_x)
+            np.copyto(y, prev_y)
+            use_newton_step = False
+            # the residual of the restored projections is computed again in the next iteration
+            squared_res.pop()
+            continue
+        squared_res.append(squared_error)
+
         # Take action if the optimization stalls or gets unstable
         # (distortion models are tricky if badly parameterized, especially in outer regions)
-        if (it > 1) and (res[-1] > res[-2] * .99999):
+        if (it > 1) and (squared_res[-1] > squared_res[-2] * .99999 ** 2):
             print("The residual for the worst distorted pixel got unstable/stalled.")
             # factor *= .5
             if it > 1e3:
                 raise Exception(
                     "The iterative distortion algorithm is unstable/stalled after 1000 iterations.")
-            if error > 1e9:
+            if squared_error > 1e9 ** 2:
                 print("Some (corner) pixels of the desired image are not defined by the used lens distortion model.")
                 print("We invite you to double-check your distortion model.")
                 print("The parameters k3,p1,p2 can easily overshoot for regions where the calibration "
@@ -146,23 +181,26 @@ def set_lens_distortion(k1: float, k2: float, k3: float = 0.0, p1: float = 0.0,
                       "these unstable pixels.")
                 raise Exception("The iterative distortion algorithm is unstable.")
 
-        # update undistorted projection
-        x -= x_ - P_und[0, :]  # * factor
-        y -= y_ - P_und[1, :]  # * factor
+        # update undistorted projection, either by a newton step or by the plain fixed-point step
+        if use_newton_step:
+            np.copyto(prev_x, x)
+            np.copyto(prev_y, y)
+            x_ /= jacobian
+            y_ /= jacobian
+        x -= x_  # * factor
+        y -= y_  # * factor
 
-    # u and v are now the pixel coordinates on the undistorted image that
+    # u = fx * x + cx and v = fy * y + cy are now the pixel coordinates on the undistorted image that
     # will distort into the row,column coordinates of the distorted image
-    u = fx * x + cx
-    v = fy * y + cy
-
-    # Stacking this way for the interpolation in the undistorted image array
-    mapping_coords = np.vstack([v, u])
+    # As this mapping is monotonic, the bounds of u and v can be computed from the bounds of x and y
+    min_u, max_u = fx * float(np.min(x)) + cx, fx * float(np.max(x)) + cx
+    min_v, max_v = fy * float(np.min(y)) + cy, fy * float(np.max(y)) + cy
 
     # Find out the image resolution needed from Blender to generate filled-in distorted images of the desired resolution
-    min_und_column_needed = np.floor(np.min(u))
-    max_und_column_needed = np.ceil(np.max(u))
-    min_und_row_needed = np.floor(np.min(v))
-    max_und_row_needed = np.ceil(np.max(v))
+    min_und_column_needed = math.floor(min_u)
+    max_und_column_needed = math.ceil(max_u)
+    min_und_row_needed = math.floor(min_v)
+    max_und_row_needed = math.ceil(max_v)
     columns_needed = max_und_column_needed + 1 - min_und_column_needed
     rows_needed = max_und_row_needed + 1 - min_und_row_needed
     cx_new = cx - min_und_column_needed
@@ -175,11 +213,17 @@ def set_lens_distortion(k1: float, k2: float, k3: float = 0.0, p1: float = 0.0,
     # suggested resolution for Blender image generation
     new_image_resolution = np.array([columns_needed, rows_needed], dtype=int)
 
-    # Adapt/shift the mapping function coordinates to the new_image_resolution resolution
+    # Stacking (v, u) this way for the interpolation in the undistorted image array.
+    # The coordinates are directly computed w.r.t. the shifted main point of the new_image_resolution resolution
     # (if we didn't, the mapping would only be valid for same resolution mapping)
     # (same resolution mapping yields undesired void image areas)
-    mapping_coords[0, :] += cy_new - cy
-    mapping_coords[1, :] += cx_new - cx
+    mapping_coords = np.empty((2, x.size), dtype=np.float64)
+    mapping_coords[0] = y
+    mapping_coords[0] *= fy
+    mapping_coords[0] += cy_new
+    mapping_coords[1] = x
+    mapping_coords[1] *= fx
+    mapping_coords[1] += cx_new
 
     camera_changed_K_matrix = CameraUtility.get_intrinsics_as_K_matrix()
     # update cx and cy in the K matrix
@@ -194,11 +238,107 @@ def set_lens_distortion(k1: float, k2: float, k3: float = 0.0, p1: float = 0.0,
                                                new_image_resolution[1], clip_start, clip_end)
 
     if use_global_storage:
-        GlobalStorage.set("_lens_distortion_is_used", {"mapping_coords": mapping_coords,
+        # single precision is sufficient for the interpolation and halves the size of the stored mapping
+        GlobalStorage.set("_lens_distortion_is_used", {"mapping_coords": mapping_coords.astype(np.float32),
                                                     "original_image_res": original_image_resolution})
     return mapping_coords
 
 
+def _get_undistorted_projections(image_resolution: Tuple[int, int], fx: float, fy: float, cx: float,
+                                 cy: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the undistorted pinhole projections at z==1 of all image pixels in row-wise image flattening.
+
+    The result of the last call is cached and reused, if the resolution and the K matrix did not change.
+
+    :param image_resolution: The image resolution as (height, width).
+    :param fx: The focal length in x direction in pixels.
+    :param fy: The focal length in y direction in pixels.
+    :param cx: The x coordinate of the principal point in pixels.
+    :param cy: The y coordinate of the principal point in pixels.
+    :return: The read-only x and y coordinates of the projections.
+    """
+    key = (int(image_resolution[0]), int(image_resolution[1]), float(fx), float(fy), float(cx), float(cy))
+    if key not in _undistorted_projection_cache:
+        # Get row,column image coordinates for all pixels for row-wise image flattening
+        # The center of the upper-left pixel has coordinates [0,0] both in DLR CalDe and python/scipy
+        # P_und = (px, py) is the undistorted pinhole projection at z==1 of all image pixels, as K has no skew it is
+        # simply inv(K) @ (column, row, 1) evaluated in closed form
+        rows = np.arange(0, image_resolution[0], dtype=np.float64)
+        columns = np.arange(0, image_resolution[1], dtype=np.float64)
+        # The iteration runs in single precision, its residual tolerance is far above the float32 resolution
+        px = np.tile(((columns - cx) / fx).astype(np.float32), image_resolution[0])
+        py = np.repeat(((rows - cy) / fy).astype(np.float32), image_resolution[1])
+        px.flags.writeable = False
+        py.flags.writeable = False
+        # Only keep the most recent projections, to not pile up memory for changing cameras
+        _undistorted_projection_cache.clear()
+        _undistorted_projection_cache[key] = (px, py)
+    return _undistorted_projection_cache[key]
+
+
+def _distort_normalized_coords(x: np.ndarray, y: np.ndarray, k1: float, k2: float, k3: float, p1: float,
+                               p2: float, scratch: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Applies the Brown-Conrady distortion model to the given normalized (z==1) undistorted camera projections.
+
+    All intermediate results are written into the given scratch buffer, so repeated calls do not allocate any
+    full-size temporaries. This matters, as this function is evaluated on the whole pixel grid in every iteration
+    of `set_lens_distortion`.
+
+    :param x: The x coordinates of the undistorted projections.
+    :param y: The y coordinates of the undistorted projections.
+    :param k1: First radial distortion parameter.
+    :param k2: Second radial distortion parameter.
+    :param k3: Third radial distortion parameter.
+    :param p1: First decentering distortion parameter.
+    :param p2: Second decentering distortion parameter.
+    :param scratch: Optional buffer of shape (5, N), where N is the number of coordinates. The distorted
+                    coordinates are written into its first two rows. If None is given, a new buffer is allocated.
+    :return: The x and y coordinates of the distorted projections, these are views into the scratch buffer.
+    """
+    if scratch is None:
+        scratch = np.empty((5, x.size), dtype=x.dtype)
+    x_, y_, r2, radial_part, tmp = scratch
+
+    np.multiply(x, x, out=r2)
+    np.multiply(y, y, out=tmp)
+    r2 += tmp
+
+    # radial_part = 1 + k1 * r2 + k2 * r2^2 + k3 * r2^3, evaluated in Horner form
+    np.multiply(r2, k3, out=radial_part)
+    radial_part += k2
+    radial_part *= r2
+    radial_part += k1
+    radial_part *= r2
+    radial_part += 1
+
+    # decentering terms which depend on 2 * x * y
+    np.multiply(x, y, out=tmp)
+    tmp *= 2
+    np.multiply(tmp, p2, out=x_)
+    np.multiply(tmp, p1, out=y_)
+
+    # radial terms
+    np.multiply(x, radial_part, out=tmp)
+    x_ += tmp
+    np.multiply(y, radial_part, out=tmp)
+    y_ += tmp
+
+    # remaining decentering terms p1 * (r2 + 2 * x^2) and p2 * (r2 + 2 * y^2)
+    np.multiply(x, x, out=tmp)
+    tmp *= 2
+    tmp += r2
+    tmp *= p1
+    x_ += tmp
+    np.multiply(y, y, out=tmp)
+    tmp *= 2
+    tmp += r2
+    tmp *= p2
+    y_ += tmp
+    return x_, y_
+
+
 def apply_lens_distortion(image: Union[List[np.ndarray], np.ndarray],
                           mapping_coords: Optional[np.ndarray] = None,
                           orig_res_x: Optional[int] = None,
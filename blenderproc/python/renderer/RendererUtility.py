@@ -1,9 +1,11 @@
 """Provides functionality to render a color, normal, depth and distance image."""
 
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import os
+import subprocess
 import threading
-from typing import IO, Union, Dict, List, Set, Optional, Any
+from typing import IO, Union, Dict, List, Set, Optional, Any, Tuple
 import math
 import sys
 import platform
@@ -634,11 +636,17 @@ def _render_progress_bar(pipe_out: int, pipe_in: int, stdout: IO, total_frames:
 def render(output_dir: Optional[str] = None, file_prefix: str = "rgb_", output_key: Optional[str] = "colors",
            load_keys: Optional[Set[str]] = None, return_data: bool = True,
            keys_with_alpha_channel: Optional[Set[str]] = None,
-           verbose: bool = False) -> Dict[str, Union[np.ndarray, List[np.ndarray]]]:
+           verbose: bool = False, batch_size: Optional[int] = None, gpu_ids: Optional[List[int]] = None,
+           num_workers: Optional[int] = None) -> Dict[str, Union[np.ndarray, List[np.ndarray]]]:
     """ Render all frames.
 
     This will go through all frames from scene.frame_start to scene.frame_end and render each of them.
 
+    If a batch_size is given and there are more frames to render, the frames are split into batches, which are
+    rendered in parallel by separate blender processes working on a copy of the current scene. Note that data
+    which only exists in memory and can not be saved into a .blend file (e.g. unsaved generated images) is not
+    available in these processes.
+
     :param output_dir: The directory to write files to, if this is None the temporary directory is used. \
                        The temporary directory is usually in the shared memory (only true for linux).
     :param file_prefix: The prefix to use for writing the images.
@@ -647,6 +655,14 @@ def render(output_dir: Optional[str] = None, file_prefix: str = "rgb_", output_k
     :param return_data: Whether to load and return generated data.
     :param keys_with_alpha_channel: A set containing all keys whose alpha channels should be loaded.
     :param verbose: If True, more details about the rendering process are printed.
+    :param batch_size: The maximum number of frames rendered by one blender process. If None is given, all frames
+                       are rendered in the current process.
+    :param gpu_ids: Only used together with batch_size. If given, each batch process only sees one of these GPUs
+                    (via CUDA_VISIBLE_DEVICES). The GPUs should also be selected via set_render_devices().
+    :param num_workers: Only used together with batch_size. The maximum number of blender processes running at
+                        the same time, each of them holds a full copy of the scene in memory. If None is given,
+                        one process per gpu id is used or two, if no gpu ids are given. The cpu threads are
+                        split evenly between the processes.
     :return: dict of lists of raw renderer output. Keys can be 'distance', 'colors', 'normals'
     """
     if output_dir is None:
@@ -682,22 +698,25 @@ def render(output_dir: Optional[str] = None, file_prefix: str = "rgb_", output_k
         # blender will render all frames in [frame_start, frame_ned]
         bpy.context.scene.frame_end -= 1
 
-        # Define pipe to communicate blenders debug messages to progress bar
-        pipe_out, pipe_in = os.pipe()
         begin = time.time()
-        with stdout_redirected(pipe_in, enabled=not verbose) as stdout:
-            with _render_progress_bar(pipe_out, pipe_in, stdout, total_frames, enabled=not verbose):
-                bpy.ops.render.render(animation=True, write_still=True)
-
-        # Close Pipes to prevent having unclosed file handles
-        try:
-            os.close(pipe_out)
-        except OSError:
-            pass
-        try:
-            os.close(pipe_in)
-        except OSError:
-            pass
+        if batch_size is not None and total_frames > batch_size:
+            _render_in_batch_processes(batch_size, gpu_ids, num_workers, verbose)
+        else:
+            # Define pipe to communicate blenders debug messages to progress bar
+            pipe_out, pipe_in = os.pipe()
+            with stdout_redirected(pipe_in, enabled=not verbose) as stdout:
+                with _render_progress_bar(pipe_out, pipe_in, stdout, total_frames, enabled=not verbose):
+                    bpy.ops.render.render(animation=True, write_still=True)
+
+            # Close Pipes to prevent having unclosed file handles
+            try:
+                os.close(pipe_out)
+            except OSError:
+                pass
+            try:
+                os.close(pipe_in)
+            except OSError:
+                pass
 
         print(f"Finished rendering after {time.time() - begin:.3f} seconds")
         # Revert changes
@@ -709,6 +728,110 @@ def render(output_dir: Optional[str] = None, file_prefix: str = "rgb_", output_k
     return _WriterUtility.load_registered_outputs(load_keys, keys_with_alpha_channel) if return_data else {}
 
 
+def _render_in_batch_processes(batch_size: int, gpu_ids: Optional[List[int]] = None,
+                               num_workers: Optional[int] = None, verbose: bool = False):
+    """ Renders all frames in [frame_start, frame_end] in parallel blender processes, each rendering one batch.
+
+    The current scene is saved into a temporary .blend file, which is then rendered by the processes via blenders
+    command line interface. As all output paths are stored in the scene, the rendered files end up at the same
+    place as if they were rendered in the current process.
+
+    :param batch_size: The maximum number of frames rendered by one process.
+    :param gpu_ids: If given, each process only sees one of these GPUs.
+    :param num_workers: The maximum number of processes running at the same time. If None is given, one process
+                        per given gpu id is used or two, if no gpu ids are given.
+    :param verbose: If True, the output of the blender processes is printed.
+    """
+    batches = _split_frames_into_batches(bpy.context.scene.frame_start, bpy.context.scene.frame_end, batch_size)
+    if num_workers is None:
+        num_workers = len(gpu_ids) if gpu_ids else 2
+    num_workers = max(1, min(num_workers, len(batches)))
+    # Share the cpu threads between the processes, by default every blender process would use all of them
+    num_threads = max(1, (os.cpu_count() or 1) // num_workers)
+
+    # The selected GPU devices are part of the user preferences and not of the .blend file, so pass them on
+    device_setup = None
+    if bpy.context.scene.cycles.device == "GPU":
+        preferences = bpy.context.preferences.addons['cycles'].preferences
+        if preferences.compute_device_type != "NONE":
+            used_device_ids = [device.id for device in preferences.get_devices_for_type(preferences.compute_device_type)
+                               if device.use]
+            device_setup = _build_device_setup_script(preferences.compute_device_type, used_device_ids)
+
+    blend_file_path = os.path.join(Utility.get_temporary_directory(), "batch_rendering.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=blend_file_path, copy=True)
+    print(f"Rendering in {len(batches)} batches of at most {batch_size} frames in {num_workers} parallel processes")
+
+    def _render_batch(batch_index: int):
+        frame_start, frame_end = batches[batch_index]
+        env = os.environ.copy()
+        if gpu_ids:
+            env["CUDA_VISIBLE_DEVICES"] = str(gpu_ids[batch_index % len(gpu_ids)])
+        cmd = _build_batch_render_command(bpy.app.binary_path, blend_file_path, frame_start, frame_end,
+                                          num_threads, device_setup)
+        result = subprocess.run(cmd, env=env, check=False, stdout=None if verbose else subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Rendering the frames {frame_start} to {frame_end} failed with exit code "
+                               f"{result.returncode}:\n{result.stdout}")
+
+    try:
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            # Consume the results to forward exceptions of the batches
+            list(executor.map(_render_batch, range(len(batches))))
+    finally:
+        os.remove(blend_file_path)
+
+
+def _split_frames_into_batches(frame_start: int, frame_end: int, batch_size: int) -> List[Tuple[int, int]]:
+    """ Splits the frames in [frame_start, frame_end] into consecutive batches.
+
+    :param frame_start: The first frame to render.
+    :param frame_end: The last frame to render (inclusive).
+    :param batch_size: The maximum number of frames per batch.
+    :return: The first and last frame (inclusive) of each batch.
+    """
+    if batch_size < 1:
+        raise ValueError(f"The batch size has to be at least one, not {batch_size}")
+    return [(start, min(start + batch_size - 1, frame_end)) for start in range(frame_start, frame_end + 1, batch_size)]
+
+
+def _build_device_setup_script(device_type: str, used_device_ids: List[str]) -> str:
+    """ Builds a python script, which selects the given GPU devices in a new blender process.
+
+    Devices are matched by their id, so the selection done via set_render_devices() is kept.
+
+    :param device_type: The cycles compute device type, e.g. "CUDA" or "OPTIX".
+    :param used_device_ids: The ids of all devices which should be used.
+    :return: The python script.
+    """
+    return (f"import bpy\n"
+            f"preferences = bpy.context.preferences.addons['cycles'].preferences\n"
+            f"preferences.compute_device_type = {device_type!r}\n"
+            f"for device in preferences.get_devices_for_type({device_type!r}):\n"
+            f"    device.use = device.id in {used_device_ids!r}\n")
+
+
+def _build_batch_render_command(blender_path: str, blend_file_path: str, frame_start: int, frame_end: int,
+                                num_threads: int, device_setup: Optional[str] = None) -> List[str]:
+    """ Builds the command line call of blender, which renders the given frames of the given .blend file.
+
+    :param blender_path: The path to the blender binary.
+    :param blend_file_path: The path to the .blend file to render.
+    :param frame_start: The first frame to render.
+    :param frame_end: The last frame to render (inclusive).
+    :param num_threads: The number of cpu threads blender should use.
+    :param device_setup: Optional, a python script which is run before rendering to select the render devices.
+    :return: The command as list of arguments.
+    """
+    cmd = [blender_path, "--background", blend_file_path, "--threads", str(num_threads)]
+    if device_setup is not None:
+        cmd += ["--python-expr", device_setup]
+    # The frame range has to be given before the render argument, as blender processes the arguments in order
+    cmd += ["--frame-start", str(frame_start), "--frame-end", str(frame_end), "--render-anim"]
+    return cmd
+
+
 def set_output_format(file_format: Optional[str] = None, color_depth: Optional[int] = None,
                       enable_transparency: Optional[bool] = None, jpg_quality: Optional[int] = None):
     """ Sets the output format to use for rendering. Default values defined in DefaultConfig.py.
@@ -12,7 +12,8 @@ def change_coordinate_frame_of_point(point: Union[np.ndarray, List[float], Vecto
 
     Example: [1, 2, 3] and ["X", "-Z", "Y"] => [1, -3, 2]
 
-    :param point: The point to convert in form of a np.ndarray, list or mathutils.Vector.
+    :param point: The point to convert in form of a np.ndarray, list or mathutils.Vector. Multiple points can be
+                  converted at once by giving an array of shape (N, 3).
     :param new_frame: An array containing three elements, describing each axis of the new coordinate frame
                       based on the axes of the current frame. Available: ["X", "Y", "Z", "-X", "-Y", "-Z"].
     :return: The converted point also in form of a np.ndarray
@@ -25,18 +26,18 @@ def change_coordinate_frame_of_point(point: Union[np.ndarray, List[float], Vecto
         axis = axis.upper()
 
         if axis.endswith("X"):
-            output.append(point[0])
+            output.append(point[..., 0])
         elif axis.endswith("Y"):
-            output.append(point[1])
+            output.append(point[..., 1])
         elif axis.endswith("Z"):
-            output.append(point[2])
+            output.append(point[..., 2])
         else:
             raise ValueError(f"Invalid axis: {axis}")
 
         if axis.startswith("-"):
-            output[-1] *= -1
+            output[-1] = -output[-1]
 
-    return np.array(output)
+    return np.stack(output, axis=-1)
 
 
 def change_target_coordinate_frame_of_transformation_matrix(matrix: Union[np.ndarray, Matrix],
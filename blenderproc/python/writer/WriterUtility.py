@@ -2,8 +2,11 @@
 
 
 import os
-from typing import List, Dict, Union, Any, Set, Tuple
+from typing import List, Dict, Union, Any, Set, Tuple, Optional
 import json
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
 
 import csv
 import numpy as np
@@ -23,7 +26,8 @@ from blenderproc.python.camera import CameraUtility
 
 
 def write_hdf5(output_dir_path: str, output_data_dict: Dict[str, List[Union[np.ndarray, list, dict]]],
-               append_to_existing_output: bool = False, stereo_separate_keys: bool = False):
+               append_to_existing_output: bool = False, stereo_separate_keys: bool = False,
+               compression: Optional[str] = "gzip", rle_segmaps: bool = False):
     """
     Saves the information provided inside of the output_data_dict into a .hdf5 container
 
@@ -37,6 +41,11 @@ def write_hdf5(output_dir_path: str, output_data_dict: Dict[str, List[Union[np.n
                                  won't be saved in one tensor [2, img_x, img_y, channels], where the img[0] is the
                                  left image and img[1] the right. They will be saved in separate keys: for example
                                  for colors in colors_0 and colors_1.
+    :param compression: The compression filter used for all image-like datasets, e.g. "gzip" or the faster but
+                        h5py-specific "lzf". If None is given, the data is stored uncompressed.
+    :param rle_segmaps: If this is True, segmentation maps (the keys "segmap" and "*_segmaps") are stored run-length
+                        encoded, see segmap_to_rle(). Each of them is saved as a group containing the datasets
+                        "counts", "values" and "size", which can be decoded via rle_to_segmap().
     """
 
     if not os.path.exists(output_dir_path):
@@ -76,13 +85,20 @@ def write_hdf5(output_dir_path: str, output_data_dict: Dict[str, List[Union[np.n
                 if adjusted_frame < len(data_block):
                     # get the current data block for the current frame
                     used_data_block = data_block[adjusted_frame]
+                    use_rle = rle_segmaps and (key == "segmap" or key.endswith("_segmaps"))
                     if stereo_separate_keys and (bpy.context.scene.render.use_multiview or
                                                  used_data_block.shape[0] == 2):
                         # stereo mode was activated
-                        _WriterUtility.write_to_hdf_file(file, key + "_0", data_block[adjusted_frame][0])
-                        _WriterUtility.write_to_hdf_file(file, key + "_1", data_block[adjusted_frame][1])
+                        _WriterUtility.write_to_hdf_file(file, key + "_0", data_block[adjusted_frame][0],
+                                                         compression, use_rle)
+                        _WriterUtility.write_to_hdf_file(file, key + "_1", data_block[adjusted_frame][1],
+                                                         compression, use_rle)
                     else:
-                        _WriterUtility.write_to_hdf_file(file, key, data_block[adjusted_frame])
+                        # Stereo images are stored together, so their chunks should not span both images
+                        is_stereo = isinstance(used_data_block, np.ndarray) and used_data_block.ndim >= 3 and \
+                            (bpy.context.scene.render.use_multiview or used_data_block.shape[0] == 2)
+                        _WriterUtility.write_to_hdf_file(file, key, data_block[adjusted_frame], compression,
+                                                         use_rle, is_stereo)
                 else:
                     raise Exception(f"There are more frames {adjusted_frame} then there are blocks of information "
                                     f" {len(data_block)} in the given list for key {key}.")
@@ -91,6 +107,35 @@ def write_hdf5(output_dir_path: str, output_data_dict: Dict[str, List[Union[np.n
                 _WriterUtility.write_to_hdf_file(file, "blender_proc_version", np.string_(blender_proc_version))
 
 
+def segmap_to_rle(segmap: np.ndarray) -> Dict[str, np.ndarray]:
+    """ Converts a segmentation map into a run-length encoding (RLE).
+
+    Similar to COCOs RLE, the map is traversed in column-major (Fortran) order, however as segmentation maps
+    contain arbitrary ids instead of only zeros and ones, the value of every run is stored as well.
+
+    :param segmap: The segmentation map of arbitrary shape, usually (H, W).
+    :return: The RLE, a dict containing the length of each run as "counts", the value of each run as "values"
+             and the shape of the segmentation map as "size".
+    """
+    flat_segmap = np.ravel(segmap, order='F')
+    # No run can be longer than the whole map, so 32 bit are enough for all usual image sizes
+    counts_dtype = np.uint32 if flat_segmap.size < 2 ** 32 else np.uint64
+    if flat_segmap.size == 0:
+        return {"counts": np.zeros(0, dtype=counts_dtype), "values": flat_segmap, "size": np.array(segmap.shape)}
+    run_starts = np.concatenate([[0], np.flatnonzero(flat_segmap[1:] != flat_segmap[:-1]) + 1])
+    counts = np.diff(np.append(run_starts, flat_segmap.size)).astype(counts_dtype)
+    return {"counts": counts, "values": flat_segmap[run_starts], "size": np.array(segmap.shape)}
+
+
+def rle_to_segmap(rle: Dict[str, np.ndarray]) -> np.ndarray:
+    """ Converts a run-length encoding (RLE) created via segmap_to_rle() back into the segmentation map.
+
+    :param rle: The RLE containing "counts", "values" and "size".
+    :return: The segmentation map.
+    """
+    return np.repeat(rle["values"], rle["counts"]).reshape(tuple(rle["size"]), order='F')
+
+
 class _WriterUtility:
 
     @staticmethod
@@ -341,13 +386,30 @@ class _WriterUtility:
                                                    world_frame_change)
 
     @staticmethod
-    def write_to_hdf_file(file, key: str, data: Union[np.ndarray, list, dict], compression: str = "gzip"):
+    def write_to_hdf_file(file, key: str, data: Union[np.ndarray, list, dict], compression: Optional[str] = "gzip",
+                          use_rle: bool = False, is_stereo: bool = False):
         """ Adds the given data as a new entry to the given hdf5 file.
 
+        Image-like data is stored chunked and compressed, small data like metadata is stored contiguously.
+
         :param file: The hdf5 file handle. Type: hdf5.File
         :param key: The key at which the data should be stored in the hdf5 file.
         :param data: The data to store.
+        :param compression: The compression filter to use for image-like data, None disables the compression.
+        :param use_rle: If True, the data is a segmentation map and is stored run-length encoded in a group.
+        :param is_stereo: If True, the data contains the left and right image along the first axis.
         """
+        if use_rle and isinstance(data, np.ndarray) and data.dtype.char != 'S':
+            group = file.create_group(key)
+            for rle_key, rle_data in segmap_to_rle(data).items():
+                # The runs are one dimensional, so they are not chunked by get_hdf5_chunk_shape(). Compress them
+                # anyway, as e.g. the values often repeat and the counts are mostly small.
+                if compression is None or rle_key == "size" or rle_data.size == 0:
+                    group.create_dataset(rle_key, data=rle_data)
+                else:
+                    group.create_dataset(rle_key, data=rle_data, compression=compression)
+            return
+
         if not isinstance(data, np.ndarray) and not isinstance(data, np.bytes_):
             if isinstance(data, (list, dict)):
                 # If the data contains one or multiple dicts that contain e.q. object states
@@ -362,4 +424,64 @@ class _WriterUtility:
         if data.dtype.char == 'S':
             file.create_dataset(key, data=data, dtype=data.dtype)
         else:
-            file.create_dataset(key, data=data, compression=compression)
+            chunks = _WriterUtility.get_hdf5_chunk_shape(data, is_stereo)
+            if chunks is None or compression is None:
+                file.create_dataset(key, data=data)
+            elif compression == "gzip":
+                dataset = file.create_dataset(key, shape=data.shape, dtype=data.dtype, chunks=chunks,
+                                              compression=compression)
+                _WriterUtility.write_gzip_chunks_directly(dataset, data)
+            else:
+                file.create_dataset(key, data=data, chunks=chunks, compression=compression)
+
+    @staticmethod
+    def write_gzip_chunks_directly(dataset: h5py.Dataset, data: np.ndarray, compression_level: int = 4):
+        """ Writes the given data into the given gzip compressed and chunked dataset, bypassing the hdf5 filter
+        pipeline.
+
+        All chunks are compressed in parallel in a thread pool (zlib releases the GIL) and are then written
+        as they are via the hdf5 direct chunk write. The resulting file can be read like any other gzip
+        compressed hdf5 dataset.
+
+        :param dataset: The empty dataset, it must have the same shape and dtype as the data.
+        :param data: The data to write.
+        :param compression_level: The gzip compression level, the default corresponds to the one used by h5py.
+        """
+        chunks = dataset.chunks
+        offsets = list(product(*[range(0, size, chunk_size) for size, chunk_size in zip(data.shape, chunks)]))
+
+        def _compress_chunk(offset: Tuple[int, ...]) -> bytes:
+            chunk = data[tuple(slice(start, start + size) for start, size in zip(offset, chunks))]
+            # Chunks at the border have to be padded to the full chunk shape
+            if chunk.shape != chunks:
+                padded_chunk = np.zeros(chunks, dtype=data.dtype)
+                padded_chunk[tuple(slice(0, size) for size in chunk.shape)] = chunk
+                chunk = padded_chunk
+            return zlib.compress(np.ascontiguousarray(chunk).tobytes(), compression_level)
+
+        with ThreadPoolExecutor() as executor:
+            for offset, compressed_chunk in zip(offsets, executor.map(_compress_chunk, offsets)):
+                dataset.id.write_direct_chunk(offset, compressed_chunk)
+
+    @staticmethod
+    def get_hdf5_chunk_shape(data: np.ndarray, is_stereo: bool = False, max_chunk_size: int = 256,
+                             min_size_in_bytes: int = 64 * 1024) -> Optional[Tuple[int, ...]]:
+        """ Determines the chunk shape used for storing the given data in a hdf5 file.
+
+        Image-like data of shape (H, W[, C]) or stereo data of shape (2, H, W[, C]) is split into tiles of at most
+        max_chunk_size x max_chunk_size pixels, each containing all channels.
+
+        :param data: The data which should be stored.
+        :param is_stereo: If True, the data contains the left and right image along the first axis.
+        :param max_chunk_size: The maximum size of a chunk along the two image axes.
+        :param min_size_in_bytes: Data smaller than this is not chunked at all.
+        :return: The chunk shape or None, if the data should be stored contiguously.
+        """
+        image_axis = 1 if is_stereo else 0
+        if data.ndim < image_axis + 2 or data.nbytes < min_size_in_bytes:
+            return None
+        chunks = list(data.shape)
+        chunks[:image_axis] = [1] * image_axis
+        chunks[image_axis] = min(data.shape[image_axis], max_chunk_size)
+        chunks[image_axis + 1] = min(data.shape[image_axis + 1], max_chunk_size)
+        return tuple(chunks)
@@ -8,9 +8,9 @@ import h5py
 import numpy as np
 
 try:
-    from visHdf5Files import vis_data
+    from visHdf5Files import vis_data, load_value
 except ModuleNotFoundError:
-    from blenderproc.scripts.visHdf5Files import vis_data
+    from blenderproc.scripts.visHdf5Files import vis_data, load_value
 
 
 def save_array_as_image(array, key, file_path):
@@ -28,7 +28,7 @@ def convert_hdf(base_file_path: str, output_folder: Optional[str] = None):
             with h5py.File(base_file_path, 'r') as data:
                 print(f"{base_file_path}:")
                 for key, val in data.items():
-                    val = np.array(val)
+                    val = load_value(val)
                     if np.issubdtype(val.dtype, np.string_) or len(val.shape) == 1:
                         pass  # metadata
                     else:
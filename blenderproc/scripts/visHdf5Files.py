@@ -46,6 +46,18 @@ def flow_to_rgb(flow):
     return cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
 
 
+def load_value(dataset):
+    """
+    Loads the given hdf5 dataset, run-length encoded segmentation maps are decoded
+    :param dataset: (h5py.Dataset or h5py.Group) the stored data
+    :return: (np.array) the loaded data
+    """
+    if isinstance(dataset, h5py.Group) and {"counts", "values", "size"} <= set(dataset.keys()):
+        return np.repeat(np.array(dataset["values"]), np.array(dataset["counts"])).reshape(
+            tuple(np.array(dataset["size"])), order='F')
+    return np.array(dataset)
+
+
 def key_matches(key, patterns, return_index=False):
     """
     Match the key to the patterns
@@ -175,7 +187,7 @@ def vis_file(path, keys_to_visualize=None, rgb_keys=None, flow_keys=None, segmap
                 # Visualize every key
                 res = []
                 for key in keys:
-                    value = np.array(data[key])
+                    value = load_value(data[key])
 
                     if sum(ele for ele in value.shape) < 5 or "version" in key:
                         if value.dtype == "|S5":
@@ -191,7 +203,7 @@ def vis_file(path, keys_to_visualize=None, rgb_keys=None, flow_keys=None, segmap
                     print("Keys: " + ', '.join(res))
 
                 for key in keys:
-                    value = np.array(data[key])
+                    value = load_value(data[key])
                     if save_to_path is not None:
                         save_to_file = os.path.join(save_to_path,
                                                     str(os.path.basename(path)).split('.', maxsplit=1)[0] +
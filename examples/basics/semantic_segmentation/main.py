@@ -1,11 +1,15 @@
 import blenderproc as bproc
 import argparse
+import numpy as np
+from scipy.spatial.transform import Rotation
 
 
 parser = argparse.ArgumentParser()
 parser.add_argument('camera', nargs='?', default="examples/resources/camera_positions", help="Path to the camera file")
 parser.add_argument('scene', nargs='?', default="examples/basics/semantic_segmentation/scene.blend", help="Path to the scene.obj file")
 parser.add_argument('output_dir', nargs='?', default="examples/basics/semantic_segmentation/output", help="Path to where the final files, will be saved")
+parser.add_argument('--hdf5_compression', default="gzip", choices=["gzip", "lzf", "none"], help="Compression used for the images in the .hdf5 containers, lzf is faster but can only be read via h5py")
+parser.add_argument('--rle_segmaps', action="store_true", help="Store the segmentation maps run-length encoded in the .hdf5 containers")
 args = parser.parse_args()
 
 bproc.init()
@@ -23,12 +27,12 @@ light.set_energy(1000)
 bproc.camera.set_resolution(512, 512)
 
 # read the camera positions file and convert into homogeneous camera-world transformation
-with open(args.camera, "r") as f:
-    for line in f.readlines():
-        line = [float(x) for x in line.split()]
-        position, euler_rotation = line[:3], line[3:6]
-        matrix_world = bproc.math.build_transformation_mat(position, euler_rotation)
-        bproc.camera.add_camera_pose(matrix_world)
+# each line contains the position and the XYZ euler rotation of one camera pose
+poses = np.loadtxt(args.camera, ndmin=2)
+matrices_world = np.tile(np.eye(4), (len(poses), 1, 1))
+matrices_world[:, :3, :3] = Rotation.from_euler("xyz", poses[:, 3:6]).as_matrix()
+matrices_world[:, :3, 3] = poses[:, :3]
+bproc.camera.add_camera_poses(matrices_world)
 
 # activate depth rendering
 bproc.renderer.enable_depth_output(activate_antialiasing=False)
@@ -39,4 +43,6 @@ bproc.renderer.enable_segmentation_output(map_by=["category_id", "instance", "na
 data = bproc.renderer.render()
 
 # write the data to a .hdf5 container
-bproc.writer.write_hdf5(args.output_dir, data)
+bproc.writer.write_hdf5(args.output_dir, data,
+                        compression=None if args.hdf5_compression == "none" else args.hdf5_compression,
+                        rle_segmaps=args.rle_segmaps)
@@ -1,11 +1,14 @@
 import blenderproc as bproc
 import argparse
 import os
+import numpy as np
 
 parser = argparse.ArgumentParser()
 parser.add_argument('camera', help="Path to the camera file which describes one camera pose per line, here the output of scn2cam from the SUNCGToolbox can be used")
 parser.add_argument('house', help="Path to the house.json file of the SUNCG scene to load")
 parser.add_argument('output_dir', nargs='?', default="examples/datasets/suncg_basic/output", help="Path to where the final files, will be saved")
+parser.add_argument('--hdf5_compression', default="gzip", choices=["gzip", "lzf", "none"], help="Compression used for the images in the .hdf5 containers, lzf is faster but can only be read via h5py")
+parser.add_argument('--rle_segmaps', action="store_true", help="Store the segmentation maps run-length encoded in the .hdf5 containers")
 args = parser.parse_args()
 
 bproc.init()
@@ -18,13 +21,14 @@ objs = bproc.loader.load_suncg(args.house, label_mapping=label_mapping)
 bproc.camera.set_resolution(512, 512)
 
 # read the camera positions file and convert into homogeneous camera-world transformation
-with open(args.camera, "r") as f:
-    for line in f.readlines():
-        line = [float(x) for x in line.split()]
-        position = bproc.math.change_coordinate_frame_of_point(line[:3], ["X", "-Z", "Y"])
-        rotation = bproc.math.change_coordinate_frame_of_point(line[3:6], ["X", "-Z", "Y"])
-        matrix_world = bproc.math.build_transformation_mat(position, bproc.camera.rotation_from_forward_vec(rotation))
-        bproc.camera.add_camera_pose(matrix_world)
+# each line contains the position and the forward vector of one camera pose
+poses = np.loadtxt(args.camera, ndmin=2)
+positions = bproc.math.change_coordinate_frame_of_point(poses[:, :3], ["X", "-Z", "Y"])
+rotations = bproc.math.change_coordinate_frame_of_point(poses[:, 3:6], ["X", "-Z", "Y"])
+matrices_world = np.tile(np.eye(4), (len(poses), 1, 1))
+matrices_world[:, :3, :3] = bproc.camera.rotation_from_forward_vecs(rotations)
+matrices_world[:, :3, 3] = positions
+bproc.camera.add_camera_poses(matrices_world)
 
 # makes Suncg objects emit light
 bproc.lighting.light_suncg_scene()
@@ -39,4 +43,6 @@ bproc.renderer.enable_segmentation_output(map_by=["category_id"])
 data = bproc.renderer.render()
 
 # write the data to a .hdf5 container
-bproc.writer.write_hdf5(args.output_dir, data)
+bproc.writer.write_hdf5(args.output_dir, data,
+                        compression=None if args.hdf5_compression == "none" else args.hdf5_compression,
+                        rle_segmaps=args.rle_segmaps)
@@ -22,14 +22,67 @@ class UnitTestCheckCamera(unittest.TestCase):
                                     [0.7770431, -0.33239999, 0.53452241, 2.0],
                                     [-0.34185314, 0.49018279, 0.8017838, 3.0],
                                     [0.0, 0.0, 0.0, 1.0]])
-        bproc.camera.add_camera_pose(cam2world_matrix)
+        frame = bproc.camera.add_camera_pose(cam2world_matrix)
 
-        cam_ob = bpy.context.scene.camera
-        cam2world_matrix_calc = np.array(cam_ob.matrix_world)
+        cam2world_matrix_calc = bproc.camera.get_camera_pose(frame)
 
         for x, y in zip(np.reshape(cam2world_matrix, -1).tolist(), np.reshape(cam2world_matrix_calc, -1).tolist()):
             self.assertAlmostEqual(x, y)
 
+    def test_camera_add_camera_poses(self):
+        """ Tests if multiple camera to world matrices are set right to consecutive frames.
+        """
+        bproc.clean_up(True)
+
+        cam2world_matrices = np.array([[[-0.5285266, -0.8057487, 0.26726118, 1.0],
+                                        [0.7770431, -0.33239999, 0.53452241, 2.0],
+                                        [-0.34185314, 0.49018279, 0.8017838, 3.0],
+                                        [0.0, 0.0, 0.0, 1.0]],
+                                       [[1.0, 0.0, 0.0, -1.0],
+                                        [0.0, 0.0, -1.0, 0.5],
+                                        [0.0, 1.0, 0.0, 2.0],
+                                        [0.0, 0.0, 0.0, 1.0]]])
+        frames = bproc.camera.add_camera_poses(cam2world_matrices)
+
+        self.assertEqual(frames, [0, 1])
+        self.assertEqual(bpy.context.scene.frame_end, 2)
+        for frame, cam2world_matrix in zip(frames, cam2world_matrices):
+            cam2world_matrix_calc = bproc.camera.get_camera_pose(frame)
+            for x, y in zip(np.reshape(cam2world_matrix, -1).tolist(),
+                            np.reshape(cam2world_matrix_calc, -1).tolist()):
+                self.assertAlmostEqual(x, y, places=6)
+
+    def test_camera_add_camera_poses_fallback(self):
+        """ Tests if the camera poses are set right for parented cameras and non-euler rotation modes.
+        """
+        cam2world_matrices = np.array([[[-0.5285266, -0.8057487, 0.26726118, 1.0],
+                                        [0.7770431, -0.33239999, 0.53452241, 2.0],
+                                        [-0.34185314, 0.49018279, 0.8017838, 3.0],
+                                        [0.0, 0.0, 0.0, 1.0]],
+                                       [[1.0, 0.0, 0.0, -1.0],
+                                        [0.0, 0.0, -1.0, 0.5],
+                                        [0.0, 1.0, 0.0, 2.0],
+                                        [0.0, 0.0, 0.0, 1.0]]])
+
+        for use_parent, rotation_mode in [(True, 'XYZ'), (False, 'QUATERNION'), (False, 'AXIS_ANGLE')]:
+            bproc.clean_up(True)
+            cam_ob = bpy.context.scene.camera
+            cam_ob.rotation_mode = rotation_mode
+            if use_parent:
+                parent = bproc.object.create_empty("camera_parent")
+                parent.set_location([1, -2, 0.5])
+                parent.set_rotation_euler([0, 0, 0.3])
+                cam_ob.parent = parent.blender_obj
+                bpy.context.view_layer.update()
+
+            frames = bproc.camera.add_camera_poses(cam2world_matrices)
+
+            for frame, cam2world_matrix in zip(frames, cam2world_matrices):
+                cam2world_matrix_calc = bproc.camera.get_camera_pose(frame)
+                for x, y in zip(np.reshape(cam2world_matrix, -1).tolist(),
+                                np.reshape(cam2world_matrix_calc, -1).tolist()):
+                    self.assertAlmostEqual(x, y, places=6)
+
     def test_camera_rotation_from_forward_vec(self):
         """ Tests if the camera rotation from forward vec is calculated right.
         """
@@ -47,3 +100,17 @@ class UnitTestCheckCamera(unittest.TestCase):
         for x, y in zip(np.reshape(correct_roation_matrix, -1).tolist(), np.reshape(calc_rotation_matrix, -1).tolist()):
             self.assertAlmostEqual(x, y, places=6)
 
+    def test_camera_rotation_from_forward_vecs(self):
+        """ Tests if the vectorized camera rotations from forward vecs match the ones of rotation_from_forward_vec.
+        """
+        forward_vecs = np.array([[-1, -2, -3], [1, 0, 0], [0.5, -2, 1], [0, 0, -1], [0, 0, 1]], dtype=np.float64)
+        inplane_rots = np.array([0.0, 0.3, -1.2, 0.0, 2.0])
+
+        calc_rotation_matrices = bproc.camera.rotation_from_forward_vecs(forward_vecs, inplane_rot=inplane_rots)
+
+        self.assertEqual(calc_rotation_matrices.shape, (5, 3, 3))
+        for forward_vec, inplane_rot, calc_rotation_matrix in zip(forward_vecs, inplane_rots, calc_rotation_matrices):
+            correct_rotation_matrix = bproc.camera.rotation_from_forward_vec(forward_vec, inplane_rot=inplane_rot)
+            for x, y in zip(np.reshape(correct_rotation_matrix, -1).tolist(),
+                            np.reshape(calc_rotation_matrix, -1).tolist()):
+                self.assertAlmostEqual(x, y, places=6)
@@ -0,0 +1,52 @@
+import blenderproc as bproc
+
+import unittest
+import numpy as np
+
+from blenderproc.python.tests.SilentMode import SilentMode
+
+
+class UnitTestCheckLensDistortion(unittest.TestCase):
+
+    @staticmethod
+    def _distort(x: np.ndarray, y: np.ndarray, k1: float, k2: float, k3: float, p1: float, p2: float):
+        r2 = x * x + y * y
+        radial_part = 1 + k1 * r2 + k2 * r2 * r2 + k3 * r2 * r2 * r2
+        return x * radial_part + 2 * p2 * x * y + p1 * (r2 + 2 * x * x), \
+            y * radial_part + 2 * p1 * x * y + p2 * (r2 + 2 * y * y)
+
+    def test_set_lens_distortion(self):
+        """ Tests if the distorted-to-undistorted mapping matches the one of the plain fixed-point iteration.
+        """
+        width, height, fx, fy = 640, 480, 500.0, 500.0
+        cx, cy = (width - 1) / 2, (height - 1) / 2
+        K = np.array([[fx, 0, cx], [0, fy, cy], [0, 0, 1]])
+        columns, rows = np.meshgrid(np.arange(width), np.arange(height))
+        px = ((columns - cx) / fx).flatten()
+        py = ((rows - cy) / fy).flatten()
+
+        # Includes strong barrel distortions, for which the radial derivative gets negative in the image corners
+        for params in [(-0.5, 0.1, 0, 0, 0), (-0.75, 0.3, 0, 0, 0), (-0.8, 0.3, 0, 0, 0), (-0.8, 0.6, 0, 0, 0),
+                       (-0.25, 0.05, 0.01, 0.001, -0.002), (0.1, 0.02, 0, 0.001, 0.001), (0.3, -0.4, 0, 0, 0)]:
+            # Reference: the plain fixed-point iteration in double precision with the same stopping criterion
+            x, y = px.copy(), py.copy()
+            for _ in range(1000):
+                x_, y_ = self._distort(x, y, *params)
+                if np.max(np.hypot(fx * (x_ - px), fy * (y_ - py))) < 0.15:
+                    break
+                x -= x_ - px
+                y -= y_ - py
+
+            bproc.camera.set_intrinsics_from_K_matrix(K, width, height)
+            with SilentMode():
+                mapping_coords = bproc.camera.set_lens_distortion(*params)
+            changed_K = bproc.camera.get_intrinsics_as_K_matrix()
+            mapped_x = (mapping_coords[1] - changed_K[0, 2]) / fx
+            mapped_y = (mapping_coords[0] - changed_K[1, 2]) / fy
+
+            self.assertTrue(np.all(np.isfinite(mapping_coords)), params)
+            # Both iterations stop at a residual below 0.15 px, so their results can differ slightly
+            self.assertLess(np.max(np.hypot(fx * (mapped_x - x), fy * (mapped_y - y))), 0.25, params)
+            # The mapped pixels have to distort back onto the pixel grid (with some slack for single precision)
+            distorted_x, distorted_y = self._distort(mapped_x, mapped_y, *params)
+            self.assertLess(np.max(np.hypot(fx * (distorted_x - px), fy * (distorted_y - py))), 0.16, params)
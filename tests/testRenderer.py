@@ -0,0 +1,47 @@
+import blenderproc as bproc
+
+import ast
+import unittest
+
+from blenderproc.python.renderer.RendererUtility import _split_frames_into_batches, _build_batch_render_command, \
+    _build_device_setup_script
+
+
+class UnitTestCheckRenderer(unittest.TestCase):
+
+    def test_split_frames_into_batches(self):
+        """ Tests if the frames are split into consecutive batches, which cover every frame exactly once.
+        """
+        self.assertEqual(_split_frames_into_batches(0, 9, 4), [(0, 3), (4, 7), (8, 9)])
+        self.assertEqual(_split_frames_into_batches(2, 7, 3), [(2, 4), (5, 7)])
+        self.assertEqual(_split_frames_into_batches(0, 4, 10), [(0, 4)])
+        self.assertEqual(_split_frames_into_batches(5, 5, 1), [(5, 5)])
+        self.assertEqual(_split_frames_into_batches(0, 2, 1), [(0, 0), (1, 1), (2, 2)])
+        with self.assertRaises(ValueError):
+            _split_frames_into_batches(0, 9, 0)
+
+    def test_build_batch_render_command(self):
+        """ Tests if the frame range is given before the render argument and the device setup is optional.
+        """
+        cmd = _build_batch_render_command("blender", "scene.blend", 4, 7, 8)
+        self.assertEqual(cmd, ["blender", "--background", "scene.blend", "--threads", "8",
+                               "--frame-start", "4", "--frame-end", "7", "--render-anim"])
+
+        device_setup = _build_device_setup_script("CUDA", ["CUDA_0", "CUDA_2"])
+        cmd = _build_batch_render_command("blender", "scene.blend", 0, 0, 1, device_setup)
+        self.assertEqual(cmd, ["blender", "--background", "scene.blend", "--threads", "1",
+                               "--python-expr", device_setup,
+                               "--frame-start", "0", "--frame-end", "0", "--render-anim"])
+
+    def test_build_device_setup_script(self):
+        """ Tests if the device setup script selects the given device type and only enables the given devices.
+        """
+        script = _build_device_setup_script("CUDA", ["CUDA_0", "CUDA_2"])
+        tree = ast.parse(script)
+
+        assigned_device_types = [ast.literal_eval(node.value) for node in ast.walk(tree)
+                                 if isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Attribute)
+                                 and node.targets[0].attr == "compute_device_type"]
+        self.assertEqual(assigned_device_types, ["CUDA"])
+        used_device_ids = [ast.literal_eval(node) for node in ast.walk(tree) if isinstance(node, ast.List)]
+        self.assertEqual(used_device_ids, [["CUDA_0", "CUDA_2"]])
@@ -0,0 +1,102 @@
+import blenderproc as bproc
+
+import unittest
+import os
+import tempfile
+import h5py
+import numpy as np
+
+from blenderproc.python.writer.WriterUtility import _WriterUtility, segmap_to_rle, rle_to_segmap
+
+
+class UnitTestCheckWriter(unittest.TestCase):
+
+    def test_hdf5_gzip_chunks_round_trip(self):
+        """ Tests if data written via the direct gzip chunk writes is read back bit-exact.
+        """
+        rng = np.random.default_rng(0)
+        test_data = {
+            # Chunks at the border are padded, as the image size is no multiple of the chunk size
+            "colors": rng.integers(0, 256, (300, 517, 3), dtype=np.uint8),
+            "depth": rng.random((300, 517), dtype=np.float32),
+            "stereo_depth": rng.random((2, 300, 517), dtype=np.float32),
+            "non_contiguous": rng.random((517, 600), dtype=np.float32)[:, ::2].T,
+            "bool": rng.random((300, 517)) > 0.5,
+            "float16": rng.random((300, 517, 3)).astype(np.float16),
+            "big_endian": rng.random((300, 517)).astype(">f8"),
+            "segmap": rng.integers(0, 10, (300, 517), dtype=np.int64),
+        }
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            hdf5_path = os.path.join(temp_dir, "0.hdf5")
+            with h5py.File(hdf5_path, "w") as file:
+                for key, data in test_data.items():
+                    _WriterUtility.write_to_hdf_file(file, key, data, is_stereo=key.startswith("stereo"))
+
+            with h5py.File(hdf5_path, "r") as file:
+                for key, data in test_data.items():
+                    dataset = file[key]
+                    # Make sure the direct chunk writes were actually used
+                    self.assertEqual(dataset.compression, "gzip")
+                    self.assertIsNotNone(dataset.chunks)
+                    loaded_data = np.array(dataset)
+                    self.assertEqual(loaded_data.dtype, data.dtype)
+                    self.assertEqual(loaded_data.shape, data.shape)
+                    self.assertEqual(loaded_data.tobytes(), np.ascontiguousarray(data).tobytes())
+
+    def test_hdf5_chunk_shape(self):
+        """ Tests if images are split into tiles, which contain all channels and never span both stereo images.
+        """
+        self.assertEqual(_WriterUtility.get_hdf5_chunk_shape(np.zeros((512, 640, 3), np.uint8)), (256, 256, 3))
+        self.assertEqual(_WriterUtility.get_hdf5_chunk_shape(np.zeros((2, 512, 640), np.float32), True),
+                         (1, 256, 256))
+        self.assertEqual(_WriterUtility.get_hdf5_chunk_shape(np.zeros((2, 512, 640, 3), np.uint8), True),
+                         (1, 256, 256, 3))
+        self.assertEqual(_WriterUtility.get_hdf5_chunk_shape(np.zeros((300, 100), np.float32)), (256, 100))
+        # Small and one dimensional data is not chunked
+        self.assertIsNone(_WriterUtility.get_hdf5_chunk_shape(np.zeros((64, 64), np.uint8)))
+        self.assertIsNone(_WriterUtility.get_hdf5_chunk_shape(np.zeros(100000, np.float32)))
+
+    def test_segmap_rle_round_trip(self):
+        """ Tests if segmentation maps are restored exactly from their run-length encoding.
+        """
+        rng = np.random.default_rng(0)
+        segmaps = [
+            # Blocky maps with few and long runs as well as noisy maps with many short runs
+            np.repeat(np.repeat(rng.integers(0, 5, (12, 16)), 25, axis=0), 40, axis=1).astype(np.uint8),
+            rng.integers(0, 1000, (300, 517)).astype(np.int32),
+            rng.integers(0, 3, (2, 64, 48, 2)),
+            # A single run
+            np.full((300, 517), 7, dtype=np.uint16),
+            np.array([[3]]),
+            # Empty maps
+            np.zeros((0, 0), dtype=np.uint8),
+            np.zeros((0, 5), dtype=np.int64),
+        ]
+        for segmap in segmaps:
+            rle = segmap_to_rle(segmap)
+            self.assertEqual(rle["counts"].dtype, np.uint32)
+            self.assertEqual(int(np.sum(rle["counts"])), segmap.size)
+            decoded_segmap = rle_to_segmap(rle)
+            self.assertEqual(decoded_segmap.dtype, segmap.dtype)
+            self.assertEqual(decoded_segmap.shape, segmap.shape)
+            self.assertTrue(np.array_equal(decoded_segmap, segmap))
+
+        rle = segmap_to_rle(np.full((300, 517), 7, dtype=np.uint16))
+        self.assertEqual(rle["counts"].tolist(), [300 * 517])
+        self.assertEqual(rle["values"].tolist(), [7])
+
+        # Also check the round trip through a hdf5 file
+        with tempfile.TemporaryDirectory() as temp_dir:
+            hdf5_path = os.path.join(temp_dir, "0.hdf5")
+            with h5py.File(hdf5_path, "w") as file:
+                for i, segmap in enumerate(segmaps):
+                    _WriterUtility.write_to_hdf_file(file, f"segmap_{i}", segmap, use_rle=True)
+
+            with h5py.File(hdf5_path, "r") as file:
+                for i, segmap in enumerate(segmaps):
+                    group = file[f"segmap_{i}"]
+                    if segmap.size > 0:
+                        self.assertEqual(group["counts"].compression, "gzip")
+                    decoded_segmap = rle_to_segmap({rle_key: np.array(group[rle_key]) for rle_key in group})
+                    self.assertTrue(np.array_equal(decoded_segmap, segmap))